@@ -0,0 +1,279 @@
+import os
+import csv
+import json
+import time
+import hashlib
+import argparse
+import logging
+from datetime import datetime
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Optional, Tuple
+
+from .workers import init_worker, get_worker_processor
+
+logger = logging.getLogger(__name__)
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv')
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+REPORT_FIELDS = ['source', 'sha256', 'status', 'frames', 'video_duration', 'processing_time', 'fps', 'output', 'error']
+WORKER_CRASH_ERROR = "Worker process crashed (decoder fault or out of memory)"
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def collect_inputs(source: str) -> List[str]:
+    if os.path.isdir(source):
+        paths = []
+        for root, _, files in os.walk(source):
+            for name in sorted(files):
+                if name.lower().endswith(VIDEO_EXTENSIONS):
+                    paths.append(os.path.join(root, name))
+        return sorted(paths)
+
+    # manifest: a JSON list of paths or a text file with one path per line
+    with open(source, 'r', encoding='utf-8') as f:
+        content = f.read()
+    base_dir = os.path.dirname(os.path.abspath(source))
+    if source.lower().endswith('.json'):
+        entries = json.loads(content)
+    else:
+        entries = [line.strip() for line in content.splitlines()]
+    return [
+        entry if os.path.isabs(entry) else os.path.join(base_dir, entry)
+        for entry in entries
+        if entry and not entry.startswith('#')
+    ]
+
+
+def load_state(state_path: str) -> Dict[str, Dict]:
+    if not os.path.exists(state_path):
+        return {}
+    with open(state_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(state_path: str, state: Dict[str, Dict]):
+    tmp_path = state_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, state_path)
+
+
+def _report_row(source: str, sha256: Optional[str] = None, status: Optional[str] = None,
+                error: Optional[str] = None) -> Dict:
+    row = {field: None for field in REPORT_FIELDS}
+    row.update({'source': source, 'sha256': sha256, 'status': status, 'error': error})
+    return row
+
+
+def _safe_sha256(path: str) -> Optional[str]:
+    try:
+        return file_sha256(path)
+    except OSError:
+        return None
+
+
+def process_one(source: str, sha256: str, output_dir: str, blur_strength: int) -> Dict:
+    row = _report_row(source, sha256)
+
+    try:
+        job_dir = os.path.join(output_dir, sha256[:16])
+        os.makedirs(job_dir, exist_ok=True)
+
+        name = os.path.splitext(os.path.basename(source))[0]
+        output_path = os.path.join(job_dir, f"blurred_{name}.mp4")
+        # write to a temporary name so a crash never leaves a truncated output that looks finished
+        tmp_output_path = os.path.join(job_dir, f".partial_{name}.mp4")
+
+        start_time = time.time()
+        analysis_result = get_worker_processor().analyze_and_process_video(
+            input_path=source,
+            output_path=tmp_output_path,
+            blur_strength=blur_strength,
+            output_json_path=os.path.join(job_dir, "analysis_result.json"),
+        )
+        os.replace(tmp_output_path, output_path)
+        elapsed = time.time() - start_time
+
+        frames = analysis_result['video_info']['decoded_frames']
+        row.update({
+            'status': 'completed',
+            'frames': frames,
+            'video_duration': round(analysis_result['video_info']['duration'], 3),
+            'processing_time': round(elapsed, 3),
+            'fps': round(frames / elapsed, 2) if elapsed > 0 else 0,
+            'output': output_path,
+        })
+    except Exception as e:
+        row['status'] = 'error'
+        row['error'] = str(e)
+
+    return row
+
+
+def _new_executor(jobs: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=jobs, initializer=init_worker)
+
+
+def _collect_result(future, source: str, sha256: str) -> Optional[Dict]:
+    # None means the pool died under this job and it has to be retried
+    try:
+        return future.result()
+    except BrokenProcessPool:
+        return None
+    except Exception as e:
+        return _report_row(source, sha256, status='error', error=str(e))
+
+
+def _run_isolated(source: str, sha256: str, output_dir: str, blur_strength: int) -> Dict:
+    executor = _new_executor(1)
+    try:
+        future = executor.submit(process_one, source, sha256, output_dir, blur_strength)
+        row = _collect_result(future, source, sha256)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return row or _report_row(source, sha256, status='error', error=WORKER_CRASH_ERROR)
+
+
+def run_batch(source: str, output_dir: str, jobs: int = 1, blur_strength: int = 15,
+              state_path: Optional[str] = None, report_path: Optional[str] = None) -> List[Dict]:
+    os.makedirs(output_dir, exist_ok=True)
+    state_path = state_path or os.path.join(output_dir, "batch_state.json")
+    report_path = report_path or os.path.join(
+        output_dir, f"batch_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    )
+
+    inputs = collect_inputs(source)
+    state = load_state(state_path)
+    logger.info(f"Batch: {len(inputs)} videos, {len(state)} already processed, {jobs} jobs")
+
+    rows = []
+    batch_start = time.time()
+
+    with open(report_path, 'w', newline='', encoding='utf-8') as report_file:
+        writer = csv.DictWriter(report_file, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+
+        def record(row: Dict):
+            if row['status'] == 'completed':
+                state[row['sha256']] = {
+                    'source': row['source'],
+                    'output': row['output'],
+                    'completed_at': datetime.now().isoformat(),
+                }
+                save_state(state_path, state)
+
+            rows.append(row)
+            writer.writerow(row)
+            report_file.flush()
+            logger.info(f"[{len(rows)}/{len(inputs)}] {row['status']}: {row['source']}"
+                        + (f" ({row['fps']} FPS)" if row['fps'] else "")
+                        + (f" - {row['error']}" if row['error'] else ""))
+
+        executor = _new_executor(jobs)
+        try:
+            # hash everything up front so finished and duplicate videos are skipped before decoding
+            hashes = list(executor.map(_safe_sha256, inputs))
+
+            queue = deque()
+            # copies of a video already queued in this run wait for the first copy's outcome
+            duplicates: Dict[str, deque] = {}
+            for path, sha256 in zip(inputs, hashes):
+                if sha256 is None:
+                    record(_report_row(path, status='error', error="Cannot read file"))
+                elif sha256 in state:
+                    row = _report_row(path, sha256, status='skipped')
+                    row['output'] = state[sha256].get('output')
+                    record(row)
+                elif sha256 in duplicates:
+                    duplicates[sha256].append(path)
+                else:
+                    duplicates[sha256] = deque()
+                    queue.append((path, sha256))
+
+            def finish(row: Dict):
+                record(row)
+                waiting = duplicates.get(row['sha256'])
+                if not waiting:
+                    return
+                if row['status'] == 'completed':
+                    while waiting:
+                        duplicate = _report_row(waiting.popleft(), row['sha256'], status='skipped')
+                        duplicate['output'] = row['output']
+                        record(duplicate)
+                else:
+                    # the first copy failed, so give the next identical file its own attempt
+                    queue.append((waiting.popleft(), row['sha256']))
+
+            # at most `jobs` videos are in flight, so a crashed worker only affects those
+            in_flight: Dict = {}
+            while queue or in_flight:
+                while queue and len(in_flight) < jobs:
+                    path, sha256 = queue.popleft()
+                    future = executor.submit(process_one, path, sha256, output_dir, blur_strength)
+                    in_flight[future] = (path, sha256)
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                if any(isinstance(future.exception(), BrokenProcessPool) for future in done):
+                    # the pool is unusable; let every in-flight job settle before deciding
+                    done, _ = wait(in_flight)
+
+                crashed: List[Tuple[str, str]] = []
+                for future in done:
+                    path, sha256 = in_flight.pop(future)
+                    row = _collect_result(future, path, sha256)
+                    if row is None:
+                        crashed.append((path, sha256))
+                    else:
+                        finish(row)
+
+                if crashed:
+                    logger.warning(f"Worker pool crashed, retrying {len(crashed)} videos one at a time")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    # rerun each affected video alone so only the one that kills its worker fails
+                    for path, sha256 in crashed:
+                        finish(_run_isolated(path, sha256, output_dir, blur_strength))
+                    executor = _new_executor(jobs)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    total_time = time.time() - batch_start
+    completed = sum(1 for row in rows if row['status'] == 'completed')
+    skipped = sum(1 for row in rows if row['status'] == 'skipped')
+    failed = sum(1 for row in rows if row['status'] == 'error')
+    logger.info(f"Batch finished in {total_time:.1f} seconds: "
+                f"{completed} completed, {skipped} skipped, {failed} failed. Report: {report_path}")
+
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Blur faces in a directory or manifest of videos")
+    parser.add_argument('source', help="Directory with videos or manifest file (.txt with one path per line, or .json list)")
+    parser.add_argument('-o', '--output-dir', default="batch_output", help="Directory for processed videos, state and reports")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help="Number of videos processed in parallel")
+    parser.add_argument('-b', '--blur-strength', type=int, default=15, choices=range(1, 51), metavar="1-50", help="Blur strength")
+    parser.add_argument('--state', default=None, help="State file used to skip processed videos and resume (default: <output-dir>/batch_state.json)")
+    parser.add_argument('--report', default=None, help="CSV report path (default: <output-dir>/batch_report_<timestamp>.csv)")
+    args = parser.parse_args(argv)
+
+    rows = run_batch(
+        source=args.source,
+        output_dir=args.output_dir,
+        jobs=max(1, args.jobs),
+        blur_strength=args.blur_strength,
+        state_path=args.state,
+        report_path=args.report,
+    )
+    return 1 if any(row['status'] == 'error' for row in rows) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
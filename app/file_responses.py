@@ -0,0 +1,114 @@
+import os
+import re
+from typing import Optional, Tuple, Iterator
+from urllib.parse import quote
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+CHUNK_SIZE = 256 * 1024
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def file_etag(path: str, suffix: str = "") -> str:
+    stat = os.stat(path)
+    tag = f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+    if suffix:
+        tag = f"{tag}-{suffix}"
+    return f'"{tag}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def _parse_range(range_header: str, file_size: int) -> Optional[Tuple[int, int]]:
+    # None means the header is ignored and the full body is sent: other units,
+    # multi-range requests and malformed ranges are all allowed to be ignored
+    match = RANGE_PATTERN.match(range_header.strip())
+    if not match:
+        return None
+
+    start_str, end_str = match.groups()
+    if not start_str and not end_str:
+        return None
+
+    if not start_str:
+        # suffix range: last N bytes
+        length = int(end_str)
+        if length == 0:
+            raise RangeNotSatisfiable()
+        start = max(0, file_size - length)
+        end = file_size - 1
+    else:
+        start = int(start_str)
+        if end_str and int(end_str) < start:
+            return None
+        if start >= file_size:
+            raise RangeNotSatisfiable()
+        end = min(int(end_str), file_size - 1) if end_str else file_size - 1
+
+    if start > end:
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+def _iter_file(path: str, start: int, end: int) -> Iterator[bytes]:
+    remaining = end - start + 1
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def ranged_file_response(request: Request, path: str, media_type: str,
+                         filename: Optional[str] = None,
+                         cache_control: str = "no-cache") -> Response:
+    file_size = os.path.getsize(path)
+    etag = file_etag(path)
+
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Cache-Control": cache_control,
+    }
+    if filename:
+        headers["Content-Disposition"] = f"attachment; filename*=utf-8''{quote(filename)}"
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range == etag):
+        try:
+            byte_range = _parse_range(range_header, file_size)
+        except RangeNotSatisfiable:
+            headers["Content-Range"] = f"bytes */{file_size}"
+            return Response(status_code=416, headers=headers)
+
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(_iter_file(path, start, end), status_code=206,
+                                     media_type=media_type, headers=headers)
+
+    headers["Content-Length"] = str(file_size)
+    return StreamingResponse(_iter_file(path, 0, file_size - 1),
+                             media_type=media_type, headers=headers)
@@ -1,15 +1,16 @@
 import os
-from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks, Response
+from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks, Response, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 from typing import Dict, Any
 
-from .video_processor import VideoProcessor
+from .startup import lifespan, startup_state, run_processor, check_pool
 from .models import *
 from .temp_storage import temp_storage
+from .file_responses import ranged_file_response, file_etag, etag_matches, not_modified
 
-app = FastAPI(title="Video Face Blurring API", version="1.0.0")
+app = FastAPI(title="Video Face Blurring API", version="1.0.0", lifespan=lifespan)
 
 # # Настройка CORS для фронтенда
 # app.add_middleware(
@@ -22,7 +23,11 @@ app = FastAPI(title="Video Face Blurring API", version="1.0.0")
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-processor = VideoProcessor()
+# Кадры исходного видео не меняются в пределах сессии, обработанное видео перезаписывается
+FRAME_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DOWNLOAD_CACHE_CONTROL = "public, no-cache"
+
+FILMSTRIP_INTERVAL = int(os.environ.get("FILMSTRIP_INTERVAL", "10"))
 
 @app.post("/api/upload", response_model=VideoUploadResponse)
 async def upload_video(file: UploadFile = File(...)):
@@ -125,7 +130,7 @@ async def process_video(video_id: str, request: ProcessRequest, background_tasks
         raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
 
 @app.get("/api/frame/{video_id}/{frame_number}")
-async def get_video_frame(video_id: str, frame_number: int):
+async def get_video_frame(video_id: str, frame_number: int, request: Request):
     try:        
         video_path = temp_storage.get_video_path(video_id)
         
@@ -133,6 +138,10 @@ async def get_video_frame(video_id: str, frame_number: int):
             print("Video not found")
             raise HTTPException(status_code=404, detail="Video not found")
         
+        etag = file_etag(video_path, suffix=str(frame_number))
+        if etag_matches(request, etag):
+            return not_modified(etag, FRAME_CACHE_CONTROL)
+        
         import cv2
         cap = cv2.VideoCapture(video_path)
         
@@ -147,7 +156,11 @@ async def get_video_frame(video_id: str, frame_number: int):
         
         _, buffer = cv2.imencode('.jpg', frame)
         
-        return Response(content=buffer.tobytes(), media_type="image/jpeg")
+        return Response(
+            content=buffer.tobytes(),
+            media_type="image/jpeg",
+            headers={"ETag": etag, "Cache-Control": FRAME_CACHE_CONTROL}
+        )
         
     except Exception as e:
         print(f"Error getting frame: {str(e)}")
@@ -155,6 +168,50 @@ async def get_video_frame(video_id: str, frame_number: int):
         print(f"Traceback: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Error getting frame: {str(e)}")
 
+@app.post("/api/auto_process/{video_id}")
+async def auto_process_video(video_id: str, request: AutoProcessRequest, background_tasks: BackgroundTasks):
+    try:
+        video_path = temp_storage.get_video_path(video_id)
+        if not video_path:
+            raise HTTPException(status_code=404, detail="Video not found")
+        
+        temp_storage.update_session_status(video_id, ProcessingStatus.PROCESSING, "Detecting and blurring faces...", 10)
+        
+        background_tasks.add_task(perform_auto_processing, video_id, video_path, request.blur_strength)
+        
+        return {"status": "processing_started", "message": "Single-pass video processing started"}
+        
+    except Exception as e:
+        temp_storage.update_session_status(video_id, ProcessingStatus.ERROR, f"Processing error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Processing error: {str(e)}")
+
+@app.get("/api/filmstrip/{video_id}")
+async def get_filmstrip(video_id: str):
+    filmstrip_index = temp_storage.get_filmstrip_index(video_id)
+    if not filmstrip_index:
+        raise HTTPException(status_code=404, detail="Filmstrip not found")
+    
+    filmstrip_index['sheet_urls'] = [
+        f"/api/filmstrip/{video_id}/{sheet_index}"
+        for sheet_index in range(len(filmstrip_index['sheets']))
+    ]
+    return filmstrip_index
+
+@app.get("/api/filmstrip/{video_id}/{sheet_index}")
+async def get_filmstrip_sheet(video_id: str, sheet_index: int, request: Request):
+    filmstrip_index = temp_storage.get_filmstrip_index(video_id)
+    if not filmstrip_index or not 0 <= sheet_index < len(filmstrip_index['sheets']):
+        raise HTTPException(status_code=404, detail="Filmstrip sheet not found")
+    
+    sheet_path = os.path.join(
+        temp_storage.get_filmstrip_dir(video_id),
+        filmstrip_index['sheets'][sheet_index]['file']
+    )
+    if not os.path.exists(sheet_path):
+        raise HTTPException(status_code=404, detail="Filmstrip sheet not found")
+    
+    return ranged_file_response(request, sheet_path, media_type="image/jpeg", cache_control=DOWNLOAD_CACHE_CONTROL)
+
 @app.post("/api/frame/{video_id}/{frame_number}/add_face")
 async def add_face_to_frame(
     video_id: str, 
@@ -261,19 +318,30 @@ async def get_processing_status(video_id: str):
     )
 
 @app.get("/api/download/{video_id}")
-async def download_video(video_id: str):
+async def download_video(video_id: str, request: Request):
     output_path = temp_storage.get_output_path(video_id)
     if not output_path or not os.path.exists(output_path):
         raise HTTPException(status_code=404, detail="Processed video not found")
     
-    filename = f"blurred_{temp_storage.sessions[video_id]['original_filename']}"
-    return FileResponse(output_path, filename=filename)
+    filename = f"blurred_{temp_storage.get_session_info(video_id)['original_filename']}"
+    return ranged_file_response(
+        request,
+        output_path,
+        media_type="video/mp4",
+        filename=filename,
+        cache_control=DOWNLOAD_CACHE_CONTROL
+    )
 
 async def perform_analysis(video_id: str, video_path: str):
     try:
         temp_storage.update_session_status(video_id, ProcessingStatus.ANALYZING, "Detecting faces...", 30)
         
-        analysis_result = processor.analyze_video(video_path)
+        analysis_result = await run_processor(
+            'analyze_video',
+            video_path,
+            filmstrip_dir=temp_storage.get_filmstrip_dir(video_id),
+            filmstrip_interval=FILMSTRIP_INTERVAL
+        )
         
         temp_storage.save_analysis_result(video_id, analysis_result)
         temp_storage.update_session_status(video_id, ProcessingStatus.ANALYZED, "Analysis completed", 100)
@@ -289,7 +357,8 @@ async def perform_processing(video_id: str, video_path: str, masks_data: Dict, b
         
         output_path = os.path.join(temp_storage.get_session_dir(video_id), "processed_video.mp4")
         
-        success = processor.process_video(
+        success = await run_processor(
+            'process_video',
             input_path=video_path,
             output_path=output_path,
             masks_data=masks_data,
@@ -305,6 +374,31 @@ async def perform_processing(video_id: str, video_path: str, masks_data: Dict, b
     except Exception as e:
         temp_storage.update_session_status(video_id, ProcessingStatus.ERROR, f"Processing failed: {str(e)}")
         
+async def perform_auto_processing(video_id: str, video_path: str, blur_strength: int):
+    try:
+        output_path = os.path.join(temp_storage.get_session_dir(video_id), "processed_video.mp4")
+        
+        analysis_result = await run_processor(
+            'analyze_and_process_video',
+            input_path=video_path,
+            output_path=output_path,
+            blur_strength=blur_strength,
+        )
+        
+        temp_storage.save_analysis_result(video_id, analysis_result)
+        temp_storage.save_output_video(video_id, output_path)
+        temp_storage.update_session_status(video_id, ProcessingStatus.COMPLETED, "Processing completed", 100)
+        
+    except Exception as e:
+        temp_storage.update_session_status(video_id, ProcessingStatus.ERROR, f"Processing failed: {str(e)}")
+
+@app.get("/api/health")
+async def health():
+    check_pool()
+    report = startup_state.report()
+    status_code = 200 if startup_state.ready else 503
+    return JSONResponse(content=report, status_code=status_code)
+
 @app.get("/")
 async def root():
     return FileResponse("static/index.html")
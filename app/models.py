@@ -31,6 +31,9 @@ class ProcessRequest(BaseModel):
     masks: Dict[str, List[FaceBoundingBox]] = Field(..., description="Маски для размытия")
     blur_strength: int = Field(15, ge=1, le=50, description="Сила размытия (1-50)")
 
+class AutoProcessRequest(BaseModel):
+    blur_strength: int = Field(15, ge=1, le=50, description="Сила размытия (1-50)")
+
 class FrameRequest(BaseModel):
     frame_number: int = Field(..., ge=0, description="Номер кадра")
     width: Optional[int] = Field(None, description="Ширина изображения")
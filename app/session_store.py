@@ -0,0 +1,137 @@
+import os
+import json
+import sqlite3
+import threading
+from typing import Dict, Any, Optional, Callable, List
+from datetime import datetime
+from .models import ProcessingStatus
+
+DATETIME_FIELDS = ('created_at', 'modified_at')
+
+
+def _encode_session(session: Dict[str, Any]) -> str:
+    def default(value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    return json.dumps(session, default=default, ensure_ascii=False)
+
+
+def _decode_session(data: str) -> Dict[str, Any]:
+    session = json.loads(data)
+    for field in DATETIME_FIELDS:
+        if isinstance(session.get(field), str):
+            session[field] = datetime.fromisoformat(session[field])
+    if 'status' in session:
+        session['status'] = ProcessingStatus(session['status'])
+    return session
+
+
+class MemorySessionStore:
+    """Fast process-local store. Only valid when the API runs in a single worker."""
+
+    def __init__(self):
+        self._sessions: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def get(self, video_id: str) -> Optional[Dict]:
+        return self._sessions.get(video_id)
+
+    def put(self, video_id: str, session: Dict):
+        with self._lock:
+            self._sessions[video_id] = session
+
+    def update(self, video_id: str, mutator: Callable[[Dict], None]) -> Optional[Dict]:
+        with self._lock:
+            session = self._sessions.get(video_id)
+            if session is None:
+                return None
+            mutator(session)
+            return session
+
+    def delete(self, video_id: str):
+        with self._lock:
+            self._sessions.pop(video_id, None)
+
+    def list_ids(self) -> List[str]:
+        return list(self._sessions.keys())
+
+
+class SQLiteSessionStore:
+    """Session store shared between worker processes, persisted in a WAL-mode SQLite file."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "video_id TEXT PRIMARY KEY, "
+            "data TEXT NOT NULL)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, video_id: str) -> Optional[Dict]:
+        row = self._connect().execute(
+            "SELECT data FROM sessions WHERE video_id = ?", (video_id,)
+        ).fetchone()
+        return _decode_session(row[0]) if row else None
+
+    def put(self, video_id: str, session: Dict):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO sessions (video_id, data) VALUES (?, ?)",
+            (video_id, _encode_session(session))
+        )
+
+    def update(self, video_id: str, mutator: Callable[[Dict], None]) -> Optional[Dict]:
+        conn = self._connect()
+        # BEGIN IMMEDIATE takes the write lock before reading, so concurrent
+        # read-modify-write cycles from other workers cannot interleave
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT data FROM sessions WHERE video_id = ?", (video_id,)
+            ).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return None
+            session = _decode_session(row[0])
+            mutator(session)
+            conn.execute(
+                "UPDATE sessions SET data = ? WHERE video_id = ?",
+                (_encode_session(session), video_id)
+            )
+            conn.execute("COMMIT")
+            return session
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, video_id: str):
+        self._connect().execute("DELETE FROM sessions WHERE video_id = ?", (video_id,))
+
+    def list_ids(self) -> List[str]:
+        rows = self._connect().execute("SELECT video_id FROM sessions").fetchall()
+        return [row[0] for row in rows]
+
+
+def create_session_store(backend: str, base_temp_dir: str):
+    if backend == 'memory':
+        return MemorySessionStore()
+    if backend == 'sqlite':
+        return SQLiteSessionStore(os.path.join(base_temp_dir, "sessions.db"))
+    raise ValueError(f"Unknown session backend: {backend}")
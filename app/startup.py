@@ -0,0 +1,200 @@
+import os
+import time
+import asyncio
+import logging
+import importlib
+import multiprocessing
+import threading
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Dict, Any, Optional
+
+from .temp_storage import temp_storage
+
+logger = logging.getLogger(__name__)
+
+IMPORT_STARTED_AT = time.monotonic()
+
+PROCESS_WORKERS = int(os.environ.get("PROCESS_WORKERS", "1"))
+
+
+class StartupState:
+    def __init__(self):
+        self.ready = False
+        self.error: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.pool_workers: list = []
+        self.pool_restarts = 0
+        self._ready_event: Optional[asyncio.Event] = None
+        self._pool_lock: Optional[asyncio.Lock] = None
+        self._restart_task: Optional[asyncio.Task] = None
+        self._local_processor = None
+        self._local_lock = threading.Lock()
+
+    def record(self, phase: str, started_at: float):
+        self.timings[phase] = round(time.monotonic() - started_at, 3)
+        logger.info(f"Startup: {phase} took {self.timings[phase]:.3f} seconds")
+
+    def local_processor(self):
+        # used when PROCESS_WORKERS=0: the detector is created on first use, not at import
+        with self._local_lock:
+            if self._local_processor is None:
+                from .workers import get_worker_processor
+                self._local_processor = get_worker_processor()
+            return self._local_processor
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "status": "ready" if self.ready else ("error" if self.error else "starting"),
+            "error": self.error,
+            "process_workers": PROCESS_WORKERS,
+            "worker_pids": self.pool_workers,
+            "pool_restarts": self.pool_restarts,
+            "timings": self.timings,
+        }
+
+
+startup_state = StartupState()
+
+
+async def _start_pool():
+    # every worker has to answer one ping behind the barrier before the pool is used
+    state = startup_state
+    loop = asyncio.get_running_loop()
+    from . import workers
+
+    mp_context = multiprocessing.get_context("spawn")
+    state.pool = ProcessPoolExecutor(
+        max_workers=PROCESS_WORKERS,
+        mp_context=mp_context,
+        initializer=workers.init_worker,
+        initargs=(mp_context.Barrier(PROCESS_WORKERS),),
+    )
+    result = await asyncio.gather(*[
+        loop.run_in_executor(state.pool, workers.ping) for _ in range(PROCESS_WORKERS)
+    ])
+    state.pool_workers = sorted(set(result))
+    if len(state.pool_workers) != PROCESS_WORKERS:
+        raise RuntimeError(f"Only {len(state.pool_workers)} of {PROCESS_WORKERS} workers warmed up")
+
+
+async def _restart_pool(broken_pool: ProcessPoolExecutor):
+    state = startup_state
+    async with state._pool_lock:
+        if state.pool is not broken_pool:
+            # another request already replaced it
+            return
+
+        logger.error("A pool worker died, restarting the worker pool")
+        state.ready = False
+        broken_pool.shutdown(wait=False, cancel_futures=True)
+        started_at = time.monotonic()
+        try:
+            await _start_pool()
+        except Exception as e:
+            state.pool = None
+            state.error = f"Worker pool restart failed: {e}"
+            logger.error(state.error)
+            return
+
+        state.pool_restarts += 1
+        state.ready = True
+        state.record("last_pool_restart", started_at)
+
+
+def check_pool():
+    # a worker killed while idle is only noticed here, so health drops to 503 and
+    # the pool is rebuilt without waiting for the next job to fail
+    state = startup_state
+    pool = state.pool
+    if state.ready and pool is not None and getattr(pool, "_broken", False):
+        state.ready = False
+        state._restart_task = asyncio.create_task(_restart_pool(pool))
+
+
+async def warm_up():
+    state = startup_state
+    loop = asyncio.get_running_loop()
+    started_at = time.monotonic()
+
+    try:
+        # importing the workers module loads cv2 and numpy; do it off the event loop
+        phase_start = time.monotonic()
+        workers = await loop.run_in_executor(None, importlib.import_module, ".workers", __package__)
+        state.record("import_modules", phase_start)
+
+        async def start_detectors():
+            # timed on its own: storage cleanup runs concurrently and must not count here
+            phase_start = time.monotonic()
+            if PROCESS_WORKERS > 0:
+                await _start_pool()
+            else:
+                await loop.run_in_executor(None, state.local_processor)
+            state.record("detector_warm_up", phase_start)
+
+        detectors_ready = asyncio.create_task(start_detectors())
+
+        cleanup_start = time.monotonic()
+        await loop.run_in_executor(None, temp_storage.cleanup_old_files)
+        state.record("storage_cleanup", cleanup_start)
+
+        await detectors_ready
+
+        state.ready = True
+        state.record("time_to_ready", started_at)
+        state.timings["since_import"] = round(time.monotonic() - IMPORT_STARTED_AT, 3)
+        logger.info(f"Startup complete, ready {state.timings['since_import']:.3f} seconds after import")
+
+    except Exception as e:
+        state.error = str(e)
+        logger.error(f"Startup warm-up failed: {e}")
+    finally:
+        state._ready_event.set()
+
+
+async def run_processor(method: str, *args, **kwargs):
+    state = startup_state
+    # the event is created by the lifespan hook, not at import: on Python 3.9 an
+    # asyncio.Event binds to the loop that exists when it is constructed
+    if state._ready_event is None:
+        raise RuntimeError("Video processor is not started: the app must run with its lifespan "
+                           "(uvicorn, or 'with TestClient(app)')")
+    await state._ready_event.wait()
+    if state.error:
+        raise RuntimeError(f"Video processor unavailable: {state.error}")
+
+    loop = asyncio.get_running_loop()
+    if PROCESS_WORKERS > 0:
+        # waits while a crashed pool is being replaced
+        async with state._pool_lock:
+            pool = state.pool
+        if pool is None:
+            raise RuntimeError(f"Video processor unavailable: {state.error}")
+
+        from .workers import call_processor
+        try:
+            return await loop.run_in_executor(pool, partial(call_processor, method, *args, **kwargs))
+        except BrokenProcessPool:
+            # the job is not retried: the input that killed the worker would likely kill the new one
+            await _restart_pool(pool)
+            raise RuntimeError("Worker process crashed while processing the video")
+
+    processor = state.local_processor()
+    return await loop.run_in_executor(None, partial(getattr(processor, method), *args, **kwargs))
+
+
+@asynccontextmanager
+async def lifespan(app):
+    startup_state.timings["app_import"] = round(time.monotonic() - IMPORT_STARTED_AT, 3)
+    startup_state._ready_event = asyncio.Event()
+    startup_state._pool_lock = asyncio.Lock()
+    warm_up_task = asyncio.create_task(warm_up())
+
+    yield
+
+    warm_up_task.cancel()
+    if startup_state.pool is not None:
+        startup_state.pool.shutdown(wait=False, cancel_futures=True)
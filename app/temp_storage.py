@@ -5,16 +5,23 @@ import uuid
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
 from .models import ProcessingStatus
+from .session_store import create_session_store
 
 class TempStorage:
     
-    def __init__(self, base_temp_dir: str = "web_temp_uploads"):
+    def __init__(self, base_temp_dir: str = "web_temp_uploads", session_backend: Optional[str] = None,
+                 cleanup_on_init: bool = True):
         self.base_temp_dir = base_temp_dir
-        self.sessions: Dict[str, Dict] = {}
         
         os.makedirs(self.base_temp_dir, exist_ok=True)
         
-        self._cleanup_old_files()
+        if session_backend is None:
+            session_backend = os.environ.get("SESSION_BACKEND", "memory")
+        self.session_backend = session_backend
+        self.store = create_session_store(session_backend, self.base_temp_dir)
+        
+        if cleanup_on_init:
+            self.cleanup_old_files()
     
     def generate_video_id(self) -> str:
         return str(uuid.uuid4())
@@ -23,7 +30,7 @@ class TempStorage:
         session_dir = os.path.join(self.base_temp_dir, video_id)
         os.makedirs(session_dir, exist_ok=True)
         
-        self.sessions[video_id] = {
+        self.store.put(video_id, {
             'video_id': video_id,
             'original_filename': original_filename,
             'session_dir': session_dir,
@@ -37,12 +44,12 @@ class TempStorage:
                 'preview_video': None,
                 'output_video': None
             }
-        }
+        })
         
         return session_dir
     
     def save_uploaded_file(self, video_id: str, file_content: bytes) -> str:
-        if video_id not in self.sessions:
+        if self.store.get(video_id) is None:
             raise ValueError(f"Session {video_id} not found")
         
         session_dir = self.get_session_dir(video_id)
@@ -51,7 +58,7 @@ class TempStorage:
         with open(file_path, 'wb') as f:
             f.write(file_content)
         
-        self.sessions[video_id]['files']['uploaded_video'] = file_path
+        self._set_file(video_id, 'uploaded_video', file_path)
         self.update_session_status(video_id, ProcessingStatus.UPLOADED, "Video uploaded successfully")
         
         return file_path
@@ -62,74 +69,105 @@ class TempStorage:
     def save_analysis_result(self, video_id: str, analysis_data: Dict[str, Any]) -> str:
         session_dir = self.get_session_dir(video_id)
         json_path = os.path.join(session_dir, "analysis_result.json")
+        tmp_path = json_path + ".tmp"
         
-        with open(json_path, 'w', encoding='utf-8') as f:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
             json.dump(analysis_data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, json_path)
         
-        self.sessions[video_id]['files']['analysis_json'] = json_path
+        self._set_file(video_id, 'analysis_json', json_path)
         return json_path
     
     def get_analysis_result(self, video_id: str) -> Optional[Dict[str, Any]]:
-        if video_id not in self.sessions:
+        session = self.store.get(video_id)
+        if session is None:
             return None
         
-        json_path = self.sessions[video_id]['files'].get('analysis_json')
+        json_path = session['files'].get('analysis_json')
         if not json_path or not os.path.exists(json_path):
             return None
         
         with open(json_path, 'r', encoding='utf-8') as f:
             return json.load(f)
     
+    def get_filmstrip_dir(self, video_id: str) -> str:
+        return os.path.join(self.get_session_dir(video_id), "filmstrip")
+    
+    def get_filmstrip_index(self, video_id: str) -> Optional[Dict[str, Any]]:
+        if self.store.get(video_id) is None:
+            return None
+        
+        index_path = os.path.join(self.get_filmstrip_dir(video_id), "index.json")
+        if not os.path.exists(index_path):
+            return None
+        
+        with open(index_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
     def get_editor_state(self, video_id: str) -> Optional[Dict]:
-        session = self.sessions.get(video_id)
+        session = self.store.get(video_id)
         if session:
             return session.get('editor_state')
         return None
 
     def save_editor_state(self, video_id: str, editor_state: Dict):
-        if video_id in self.sessions:
-            self.sessions[video_id]['editor_state'] = editor_state
-            self.sessions[video_id]['modified_at'] = datetime.now()
+        def mutate(session: Dict):
+            session['editor_state'] = editor_state
+            session['modified_at'] = datetime.now()
+        
+        self.store.update(video_id, mutate)
 
     def update_face_detection(self, video_id: str, faces_by_frame: Dict):
-        if video_id in self.sessions and 'analysis_result' in self.sessions[video_id]:
-            self.sessions[video_id]['analysis_result']['faces_by_frame'] = faces_by_frame
-            self.sessions[video_id]['modified_at'] = datetime.now()
+        def mutate(session: Dict):
+            if 'analysis_result' in session:
+                session['analysis_result']['faces_by_frame'] = faces_by_frame
+                session['modified_at'] = datetime.now()
+        
+        self.store.update(video_id, mutate)
 
     def save_output_video(self, video_id: str, output_path: str) -> str:
-        self.sessions[video_id]['files']['output_video'] = output_path
+        self._set_file(video_id, 'output_video', output_path)
         return output_path
     
     def get_session_info(self, video_id: str) -> Optional[Dict]:
-        return self.sessions.get(video_id)
+        return self.store.get(video_id)
     
     def update_session_status(self, video_id: str, status: ProcessingStatus, 
                             message: str = "", progress: float = 0.0):
-        if video_id in self.sessions:
-            self.sessions[video_id]['status'] = status
-            self.sessions[video_id]['message'] = message
-            self.sessions[video_id]['progress'] = progress
+        def mutate(session: Dict):
+            session['status'] = status
+            session['message'] = message
+            session['progress'] = progress
+        
+        self.store.update(video_id, mutate)
     
     def get_video_path(self, video_id: str) -> Optional[str]:
-        return self.sessions.get(video_id, {}).get('files', {}).get('uploaded_video')
+        return (self.store.get(video_id) or {}).get('files', {}).get('uploaded_video')
 
     
     def get_output_path(self, video_id: str) -> Optional[str]:
-        return self.sessions.get(video_id, {}).get('files', {}).get('output_video')
+        return (self.store.get(video_id) or {}).get('files', {}).get('output_video')
     
     def cleanup_session(self, video_id: str):
-        if video_id in self.sessions:
+        if self.store.get(video_id) is not None:
             session_dir = self.get_session_dir(video_id)
             if os.path.exists(session_dir):
-                shutil.rmtree(session_dir)
-            del self.sessions[video_id]
+                shutil.rmtree(session_dir, ignore_errors=True)
+            self.store.delete(video_id)
+    
+    def _set_file(self, video_id: str, file_key: str, path: str):
+        def mutate(session: Dict):
+            session['files'][file_key] = path
+        
+        self.store.update(video_id, mutate)
     
-    def _cleanup_old_files(self, hours_old: int = 24):
+    def cleanup_old_files(self, hours_old: int = 24):
         cutoff_time = datetime.now() - timedelta(hours=hours_old)
         
-        for video_id in list(self.sessions.keys()):
-            session = self.sessions[video_id]
-            if session['created_at'] < cutoff_time:
+        for video_id in self.store.list_ids():
+            session = self.store.get(video_id)
+            if session and session['created_at'] < cutoff_time:
                 self.cleanup_session(video_id)
 
-temp_storage = TempStorage()
\ No newline at end of file
+# the old-session scan runs during app warm-up, see startup.py
+temp_storage = TempStorage(cleanup_on_init=False)
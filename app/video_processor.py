@@ -6,6 +6,7 @@ from typing import List, Dict, Optional
 from dataclasses import dataclass
 import logging
 import time
+import subprocess
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -17,6 +18,94 @@ class FaceBoundingBox:
     width: int
     height: int
 
+class FilmstripWriter:
+    def __init__(self, output_dir: str, total_frames: int, interval: int = 10,
+                 thumb_width: int = 160, columns: int = 10, rows: int = 10):
+        self.output_dir = output_dir
+        self.total_frames = total_frames
+        self.interval = max(1, interval)
+        self.thumb_width = thumb_width
+        self.thumb_height = None
+        self.columns = columns
+        self.rows = rows
+        self.per_sheet = columns * rows
+        
+        self._sheet = None
+        self._sheet_count = 0
+        self._thumbs_in_sheet = 0
+        self._thumbnail_count = 0
+        self._sheets = []
+        
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def wants(self, frame_number: int) -> bool:
+        return frame_number % self.interval == 0
+
+    def add(self, frame_number: int, frame: np.ndarray):
+        if not self.wants(frame_number):
+            return
+        
+        h, w = frame.shape[:2]
+        if self.thumb_height is None:
+            self.thumb_height = max(1, int(h * self.thumb_width / w))
+        
+        if self._sheet is None:
+            self._sheet = np.zeros(
+                (self.rows * self.thumb_height, self.columns * self.thumb_width, 3),
+                dtype=np.uint8
+            )
+        
+        thumb = cv2.resize(frame, (self.thumb_width, self.thumb_height), interpolation=cv2.INTER_AREA)
+        row, col = divmod(self._thumbs_in_sheet, self.columns)
+        y, x = row * self.thumb_height, col * self.thumb_width
+        self._sheet[y:y + self.thumb_height, x:x + self.thumb_width] = thumb
+        
+        self._thumbs_in_sheet += 1
+        self._thumbnail_count += 1
+        if self._thumbs_in_sheet == self.per_sheet:
+            self._flush_sheet()
+
+    def _flush_sheet(self):
+        if self._sheet is None or self._thumbs_in_sheet == 0:
+            return
+        
+        used_rows = (self._thumbs_in_sheet + self.columns - 1) // self.columns
+        sheet = self._sheet[:used_rows * self.thumb_height]
+        filename = f"sprite_{self._sheet_count}.jpg"
+        cv2.imwrite(os.path.join(self.output_dir, filename), sheet, [cv2.IMWRITE_JPEG_QUALITY, 75])
+        
+        self._sheets.append({
+            'file': filename,
+            'first_thumbnail': self._thumbnail_count - self._thumbs_in_sheet,
+            'count': self._thumbs_in_sheet
+        })
+        self._sheet = None
+        self._sheet_count += 1
+        self._thumbs_in_sheet = 0
+
+    def finish(self) -> Dict:
+        self._flush_sheet()
+        
+        index = {
+            'interval': self.interval,
+            'total_frames': self.total_frames,
+            'thumbnail_count': self._thumbnail_count,
+            'thumb_width': self.thumb_width,
+            'thumb_height': self.thumb_height or 0,
+            'columns': self.columns,
+            'rows': self.rows,
+            'sheets': self._sheets
+        }
+        
+        index_path = os.path.join(self.output_dir, "index.json")
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, index_path)
+        
+        logger.info(f"Filmstrip: {self._thumbnail_count} thumbnails in {len(self._sheets)} sprite sheets")
+        return index
+
 class VideoProcessor:
     def __init__(self):
         self.detector_type = 'haar'
@@ -29,6 +118,12 @@ class VideoProcessor:
         
         logger.info("Haar cascade face detector initialized")
 
+    def warm_up(self):
+        # the first detectMultiScale call allocates the cascade's internal buffers
+        start_time = time.time()
+        self.detect_faces(np.zeros((480, 640, 3), dtype=np.uint8))
+        logger.info(f"Face detector warmed up in {time.time() - start_time:.3f} seconds")
+
     def detect_faces(self, frame: np.ndarray) -> List[FaceBoundingBox]:
         h, w = frame.shape[:2]
         faces = []
@@ -62,7 +157,8 @@ class VideoProcessor:
         
         return faces
 
-    def analyze_video(self, video_path: str, output_json_path: Optional[str] = None) -> Dict:
+    def analyze_video(self, video_path: str, output_json_path: Optional[str] = None,
+                      filmstrip_dir: Optional[str] = None, filmstrip_interval: int = 10) -> Dict:
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"Video file not found: {video_path}")
         
@@ -84,6 +180,10 @@ class VideoProcessor:
         previous_faces = []   
         frame_number = 0
         
+        filmstrip = None
+        if filmstrip_dir:
+            filmstrip = FilmstripWriter(filmstrip_dir, total_frames, interval=filmstrip_interval)
+        
         start_time = time.time()
         
         while True:
@@ -91,26 +191,13 @@ class VideoProcessor:
             if not ret:
                 break
             
+            if filmstrip:
+                filmstrip.add(frame_number, frame)
+            
             current_faces = []
             
             if frame_number % frame_skip == 0:
-                analysis_frame = self._resize_frame(frame, target_width)
-                current_faces = self.detect_faces(analysis_frame)
-                
-                if current_faces:
-                    scale_w = width / analysis_frame.shape[1]
-                    scale_h = height / analysis_frame.shape[0]
-                    
-                    scaled_faces = []
-                    for face in current_faces:
-                        scaled_faces.append(FaceBoundingBox(
-                            x=int(face.x * scale_w),
-                            y=int(face.y * scale_h),
-                            width=int(face.width * scale_w),
-                            height=int(face.height * scale_h),
-                        ))
-                    current_faces = scaled_faces
-                
+                current_faces = self._detect_scaled_faces(frame, width, height, target_width)
                 previous_faces = current_faces
             else:
                 current_faces = previous_faces
@@ -137,11 +224,46 @@ class VideoProcessor:
         
         cap.release()
         
+        if filmstrip:
+            filmstrip.finish()
+        
         total_time = time.time() - start_time
         logger.info(f"Analysis completed in {total_time:.1f} seconds")
         logger.info(f"Results: {len(faces_by_frame)}/{total_frames} frames contain faces")
      
-        result = {
+        result = self._build_analysis_result(video_path, fps, total_frames, width, height,
+                                             faces_by_frame, frame_skip, total_time)
+        
+        if output_json_path:
+            self._save_to_json(result, output_json_path)
+        
+        return result
+
+    def _detect_scaled_faces(self, frame: np.ndarray, width: int, height: int,
+                             target_width: int) -> List[FaceBoundingBox]:
+        analysis_frame = self._resize_frame(frame, target_width)
+        faces = self.detect_faces(analysis_frame)
+        
+        if not faces:
+            return faces
+        
+        scale_w = width / analysis_frame.shape[1]
+        scale_h = height / analysis_frame.shape[0]
+        
+        return [
+            FaceBoundingBox(
+                x=int(face.x * scale_w),
+                y=int(face.y * scale_h),
+                width=int(face.width * scale_w),
+                height=int(face.height * scale_h),
+            )
+            for face in faces
+        ]
+
+    def _build_analysis_result(self, video_path: str, fps: float, total_frames: int,
+                               width: int, height: int, faces_by_frame: Dict,
+                               frame_skip: int, total_time: float) -> Dict:
+        return {
             'video_info': {
                 'file_path': video_path,
                 'fps': fps,
@@ -157,11 +279,6 @@ class VideoProcessor:
                 'processing_time': total_time
             }
         }
-        
-        if output_json_path:
-            self._save_to_json(result, output_json_path)
-        
-        return result
 
     def _resize_frame(self, frame: np.ndarray, target_width: int) -> np.ndarray:
         h, w = frame.shape[:2]
@@ -185,8 +302,6 @@ class VideoProcessor:
 
     def process_video(self, input_path: str, output_path: str, 
                         masks_data: Dict, blur_strength: int = 25) -> bool:
-        import subprocess
-        
         if not os.path.exists(input_path):
             raise FileNotFoundError(f"Input video not found: {input_path}")
         
@@ -199,23 +314,7 @@ class VideoProcessor:
         height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         
-        ffmpeg_cmd = [
-            'ffmpeg', '-y',
-            '-f', 'rawvideo',
-            '-vcodec', 'rawvideo',
-            '-pix_fmt', 'bgr24',
-            '-s', f'{width}x{height}',
-            '-r', str(fps),
-            '-i', '-', 
-            '-c:v', 'libx264',
-            '-preset', 'medium',
-            '-crf', '23',
-            '-pix_fmt', 'yuv420p',
-            '-f', 'mp4',
-            output_path
-        ]
-        
-        ffmpeg_process = subprocess.Popen(ffmpeg_cmd, stdin=subprocess.PIPE)
+        ffmpeg_process = self._start_encoder(output_path, width, height, fps)
         
         compiled_masks = {}
         for frame_key, masks in masks_data.items():
@@ -262,6 +361,117 @@ class VideoProcessor:
         logger.info(f"H.264 processing completed in {total_time:.1f} seconds")
         return True
 
+    def analyze_and_process_video(self, input_path: str, output_path: str, blur_strength: int = 25,
+                                  output_json_path: Optional[str] = None) -> Dict:
+        if not os.path.exists(input_path):
+            raise FileNotFoundError(f"Input video not found: {input_path}")
+        
+        cap = cv2.VideoCapture(input_path)
+        if not cap.isOpened():
+            raise ValueError(f"Cannot open input video: {input_path}")
+        
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        
+        logger.info(f"ANALYZE+PROCESS: {total_frames} frames, {fps} FPS, {width}x{height}")
+        
+        frame_skip = 3
+        target_width = 640
+        
+        ffmpeg_process = None
+        encoder_closed_early = False
+        faces_by_frame = {}
+        current_faces = []
+        frame_number = 0
+        start_time = time.time()
+        
+        try:
+            ffmpeg_process = self._start_encoder(output_path, width, height, fps)
+            
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                
+                if frame_number % frame_skip == 0:
+                    current_faces = self._detect_scaled_faces(frame, width, height, target_width)
+                
+                if current_faces:
+                    faces_by_frame[str(frame_number)] = [
+                        {
+                            'x': f.x,
+                            'y': f.y,
+                            'width': f.width,
+                            'height': f.height,
+                        }
+                        for f in current_faces
+                    ]
+                    masks = [(f.x, f.y, f.width, f.height) for f in current_faces]
+                    frame = self._apply_blur(frame, masks, blur_strength)
+                
+                ffmpeg_process.stdin.write(frame.tobytes())
+                
+                frame_number += 1
+                
+                if frame_number % 100 == 0:
+                    elapsed = time.time() - start_time
+                    frames_per_sec = frame_number / elapsed if elapsed > 0 else 0
+                    logger.info(f"Frame {frame_number}/{total_frames} "
+                               f"({frames_per_sec:.1f} FPS) - "
+                               f"Found {len(faces_by_frame)} frames with faces")
+        except BrokenPipeError:
+            # ffmpeg exited mid-stream; its return code is reported below
+            encoder_closed_early = True
+        finally:
+            cap.release()
+            if ffmpeg_process is not None:
+                try:
+                    ffmpeg_process.stdin.close()
+                except BrokenPipeError:
+                    encoder_closed_early = True
+                ffmpeg_process.wait()
+        
+        if encoder_closed_early or ffmpeg_process.returncode != 0:
+            raise RuntimeError(f"ffmpeg exited with code {ffmpeg_process.returncode} "
+                               f"after {frame_number}/{total_frames} frames")
+        
+        total_time = time.time() - start_time
+        logger.info(f"Single-pass analysis and processing completed in {total_time:.1f} seconds")
+        
+        result = self._build_analysis_result(input_path, fps, total_frames, width, height,
+                                             faces_by_frame, frame_skip, total_time)
+        # the container's frame count can be wrong; keep what was actually decoded
+        result['video_info']['decoded_frames'] = frame_number
+        result['analysis_settings']['single_pass'] = True
+        result['analysis_settings']['blur_strength'] = blur_strength
+        
+        if output_json_path:
+            self._save_to_json(result, output_json_path)
+        
+        return result
+
+    def _start_encoder(self, output_path: str, width: int, height: int, fps: float) -> subprocess.Popen:
+        ffmpeg_cmd = [
+            'ffmpeg', '-y',
+            '-f', 'rawvideo',
+            '-vcodec', 'rawvideo',
+            '-pix_fmt', 'bgr24',
+            '-s', f'{width}x{height}',
+            '-r', str(fps),
+            '-i', '-', 
+            '-c:v', 'libx264',
+            '-preset', 'medium',
+            '-crf', '23',
+            '-pix_fmt', 'yuv420p',
+            '-movflags', '+faststart',
+            '-f', 'mp4',
+            output_path
+        ]
+        
+        return subprocess.Popen(ffmpeg_cmd, stdin=subprocess.PIPE)
+
     def _apply_blur(self, frame: np.ndarray, masks: list, blur_strength: int) -> np.ndarray:
         if not masks:
             return frame
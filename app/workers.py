@@ -0,0 +1,34 @@
+import os
+from typing import Optional
+
+from .video_processor import VideoProcessor
+
+_processor: Optional[VideoProcessor] = None
+_startup_barrier = None
+
+STARTUP_BARRIER_TIMEOUT = 300
+
+
+def init_worker(startup_barrier=None):
+    global _processor, _startup_barrier
+    _processor = VideoProcessor()
+    _processor.warm_up()
+    _startup_barrier = startup_barrier
+
+
+def get_worker_processor() -> VideoProcessor:
+    if _processor is None:
+        init_worker()
+    return _processor
+
+
+def call_processor(method: str, *args, **kwargs):
+    return getattr(get_worker_processor(), method)(*args, **kwargs)
+
+
+def ping() -> int:
+    # a worker blocks here until every worker has warmed up and pinged, so
+    # each ping submitted at startup is answered by a different process
+    if _startup_barrier is not None:
+        _startup_barrier.wait(STARTUP_BARRIER_TIMEOUT)
+    return os.getpid()
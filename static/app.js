@@ -17,6 +17,9 @@ class VideoProcessorApp {
         this.currentY = 0;
         this.tempRect = null;
 
+        this.filmstrip = null;
+        this.filmstripSheets = [];
+
         this.videoScaleX = 1;
         this.videoScaleY = 1;
         this.canvasWidth = 800;
@@ -141,6 +144,12 @@ class VideoProcessorApp {
             canvas.addEventListener('mouseup', (e) => this.handleCanvasMouseUp(e));
         }
 
+        const frameScrubber = document.getElementById('frameScrubber');
+        if (frameScrubber) {
+            frameScrubber.addEventListener('input', (e) => this.previewThumbnail(parseInt(e.target.value)));
+            frameScrubber.addEventListener('change', (e) => this.goToFrame(parseInt(e.target.value)));
+        }
+
         const skipEditingBtn = document.getElementById('skipEditingBtn');
         if (skipEditingBtn) {
             skipEditingBtn.addEventListener('click', () => {
@@ -393,7 +402,7 @@ class VideoProcessorApp {
 
                     const processedVideo = document.getElementById('processedVideo');
                     if (processedVideo) {
-                        const downloadUrl = `/api/download/${this.videoId}?v=${this.processVersion}&t=${new Date().getTime()}`;
+                        const downloadUrl = `/api/download/${this.videoId}?v=${this.processVersion}`;
                         processedVideo.src = downloadUrl;
                         console.log('Processed video URL:', downloadUrl, 'Blur strength:', blurStrength);
 
@@ -443,6 +452,8 @@ class VideoProcessorApp {
         this.analysisResult = null;
         this.isProcessing = false;
         this.processVersion = 0;
+        this.filmstrip = null;
+        this.filmstripSheets = [];
 
         this.showStep('upload');
 
@@ -525,6 +536,92 @@ class VideoProcessorApp {
         document.getElementById('totalFrames').textContent = totalFrames;
         this.currentFrame = 0;
         this.loadFrame(this.currentFrame);
+        this.loadFilmstrip();
+    }
+
+    async loadFilmstrip() {
+        const filmstripDiv = document.getElementById('filmstrip');
+        const track = document.getElementById('filmstripTrack');
+        const scrubber = document.getElementById('frameScrubber');
+        if (!filmstripDiv || !track || !scrubber) return;
+
+        try {
+            const response = await fetch(`/api/filmstrip/${this.videoId}`);
+            if (!response.ok) {
+                throw new Error(`Filmstrip load failed: ${response.status}`);
+            }
+
+            this.filmstrip = await response.json();
+            this.filmstripSheets = this.filmstrip.sheet_urls.map(url => {
+                const img = new Image();
+                img.src = url;
+                return img;
+            });
+
+            const { interval, thumb_width, thumb_height, columns, sheets } = this.filmstrip;
+            track.innerHTML = '';
+            sheets.forEach((sheet, sheetIndex) => {
+                for (let i = 0; i < sheet.count; i++) {
+                    const thumbnailIndex = sheet.first_thumbnail + i;
+                    const thumb = document.createElement('div');
+                    thumb.className = 'filmstrip-thumb';
+                    thumb.dataset.frame = thumbnailIndex * interval;
+                    thumb.style.width = `${thumb_width}px`;
+                    thumb.style.height = `${thumb_height}px`;
+                    thumb.style.backgroundImage = `url(${this.filmstrip.sheet_urls[sheetIndex]})`;
+                    thumb.style.backgroundPosition = `-${(i % columns) * thumb_width}px -${Math.floor(i / columns) * thumb_height}px`;
+                    thumb.addEventListener('click', () => this.goToFrame(thumbnailIndex * interval));
+                    track.appendChild(thumb);
+                }
+            });
+
+            scrubber.max = this.analysisResult.video_info.total_frames - 1;
+            scrubber.value = this.currentFrame;
+            filmstripDiv.classList.remove('hidden');
+            this.highlightFilmstripThumb(this.currentFrame);
+
+        } catch (error) {
+            console.error('Error loading filmstrip:', error);
+            this.filmstrip = null;
+            filmstripDiv.classList.add('hidden');
+        }
+    }
+
+    previewThumbnail(frameNumber) {
+        if (!this.filmstrip) return;
+
+        const { interval, thumb_width, thumb_height, columns, rows, thumbnail_count } = this.filmstrip;
+        const thumbnailIndex = Math.min(Math.round(frameNumber / interval), thumbnail_count - 1);
+        const perSheet = columns * rows;
+        const sheetImage = this.filmstripSheets[Math.floor(thumbnailIndex / perSheet)];
+        if (!sheetImage || !sheetImage.complete) return;
+
+        const positionInSheet = thumbnailIndex % perSheet;
+        const canvas = document.getElementById('faceCanvas');
+        const ctx = canvas.getContext('2d');
+        ctx.drawImage(
+            sheetImage,
+            (positionInSheet % columns) * thumb_width,
+            Math.floor(positionInSheet / columns) * thumb_height,
+            thumb_width, thumb_height,
+            0, 0, canvas.width, canvas.height
+        );
+        this.drawFacesForFrame(frameNumber);
+        document.getElementById('currentFrame').textContent = frameNumber;
+    }
+
+    highlightFilmstripThumb(frameNumber) {
+        if (!this.filmstrip) return;
+
+        const activeFrame = Math.floor(frameNumber / this.filmstrip.interval) * this.filmstrip.interval;
+        document.querySelectorAll('.filmstrip-thumb').forEach(thumb => {
+            thumb.classList.toggle('active', parseInt(thumb.dataset.frame) === activeFrame);
+        });
+    }
+
+    goToFrame(frameNumber) {
+        this.currentFrame = frameNumber;
+        this.loadFrame(frameNumber);
     }
 
     async loadFrame(frameNumber) {
@@ -576,6 +673,10 @@ class VideoProcessorApp {
             document.getElementById('frameNumber').textContent = frameNumber;
             this.updateFacesList(frameNumber);
 
+            const frameScrubber = document.getElementById('frameScrubber');
+            if (frameScrubber) frameScrubber.value = frameNumber;
+            this.highlightFilmstripThumb(frameNumber);
+
         } catch (error) {
             console.error('❌ Error loading frame:', error);
             this.showStatus('error', `Failed to load frame ${frameNumber}: ${error.message}`, document.getElementById('editStatus'));